@@ -72,6 +72,9 @@ void setup() {
 
   // Turn on built in LED
   digitalWrite(LED_BUILTIN, HIGH);
+
+  // Tell the GUI that setup is done
+  Serial.println("READY");
 }
 
 int val = -1;
@@ -80,7 +83,7 @@ void loop() {
   float aFlow = 0;
   float aTemperature = 0.0;
   uint16_t aSignalingFlags = 0u;
-  int adcValue = -1;
+  uint16_t adcValue = 0; // 2 bytes on every board (int is 4 bytes on the Teensy)
   
   char start = 'E';
   byte payloadLength = 0;
@@ -93,7 +96,11 @@ void loop() {
     String command = Serial.readStringUntil('\n'); // Read incoming command
     command.trim(); // Remove any trailing newline or spaces
 
-    if (command.startsWith("R")) {
+    if (command == "READY?") {
+      // Readiness query from the GUI, for boards that do not reset when the port is opened
+      Serial.println("READY");
+    }
+    else if (command.startsWith("R")) {
       if (command.endsWith("A0")) {
         adcValue = analogRead(A0);
         start = 'R';
@@ -119,7 +126,8 @@ void loop() {
         }
       }
       else if (command.endsWith("AL")) {
-        // Read all command: returns 'R', ADC0 value (2 byte), ADC1 value (2 byte), Flow sensor value (4 byte), \n
+        // Read all command: returns 'R' ('E' on flow sensor error), payload length (1 byte, 8),
+        // ADC0 value (2 byte), ADC1 value (2 byte), Flow sensor value (4 byte), \n
         start = 'R';
 
         adcValue = analogRead(A0);
@@ -175,7 +183,7 @@ void loop() {
       }
     }
     else {
-      Serial.println("ERR: Unknown command. Use READ A0, A1, FS.");
+      Serial.println("ERR: Unknown command. Use READY?, R A0, R A1, R FS, R AL or PRINT A0, A1, FS.");
     }
   }
 }
@@ -1,108 +1,307 @@
+import os
 import sys
 import numpy as np
-import csv
 import struct
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QSlider, QComboBox, QCheckBox, QLabel, QFileDialog,
-    QMenuBar, QMenu, QMessageBox, QGridLayout, QDoubleSpinBox
+    QApplication, QMainWindow, QWidget, QPushButton, QComboBox, QCheckBox,
+    QLabel, QFileDialog, QMessageBox, QGridLayout, QDoubleSpinBox
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QObject, QThread, QIODevice, pyqtSignal, pyqtSlot
+from PyQt6.QtSerialPort import QSerialPort, QSerialPortInfo
 import pyqtgraph as pg
 import pyqtgraph.exporters
-from collections import deque
 
-import serial
-import serial.tools.list_ports
+import logging
+from functools import partial
 import time
 
-class ArduinoSerial():
+logger = logging.getLogger(__name__)
+
+READ_ALL_COMMAND = b"R AL\n" # Read all sensor command
+READY_QUERY = b"READY?\n" # Readiness query, answered with READY_REPLY
+READY_REPLY = b"READY" # Sent by the sketch at the end of setup and in reply to READY_QUERY
+BOOTLOADER_WINDOW = 1.5 # Seconds a board may stay in its bootloader after a DTR reset
+READ_ALL_PAYLOAD = struct.Struct('<HHf') # Read all payload: ADC0 (uint16), ADC1 (uint16), Flow sensor (float32)
+
+# Frame bytes sent by the Arduino
+FRAME_READ = 0x52 # 'R', start of a read frame
+FRAME_ERROR = 0x45 # 'E', start of a sensor error frame
+FRAME_END = 0x0A # '\n', end of a frame
+
+class FrameDecoder(QObject):
+    """
+    Splits the byte stream received from the Arduino into frames.
+    A frame is a start byte ('R' for read, 'E' for sensor error), the payload length (1 byte),
+    the payload and a newline. Bytes are accumulated in a fixed-size circular buffer across calls to feed,
+    and the payload of every complete read frame is emitted through the frameReady signal.
+    Bytes that do not start a valid frame (e.g. text messages from the Arduino) are skipped.
+    """
+    frameReady = pyqtSignal(bytes)
+
+    def __init__(self, size: int = 4096):
+        """
+        Initializes the FrameDecoder with an empty circular receive buffer.
+        
+        :param size: Capacity of the receive buffer in bytes (default is 4096). If the buffer
+                     overflows, the oldest bytes are dropped.
+        """
+        super().__init__()
+        self._ring = bytearray(size)
+        self._view = memoryview(self._ring) # Slices of the view do not copy
+        self._head = 0 # Index of the oldest unread byte
+        self._count = 0 # Number of unread bytes
+
+    def feed(self, data: bytes):
+        """
+        Appends received bytes to the buffer and emits the payload of every complete read frame.
+        Incomplete frames are kept in the buffer until the rest of the frame arrives.
+        
+        :param data: Bytes received from the serial port
+        
+        :return: None
+        """
+        size = len(self._ring)
+        data = memoryview(data)
+        if len(data) > size:
+            data = data[-size:]
+
+        # Drop the oldest bytes if the new data does not fit
+        overflow = self._count + len(data) - size
+        if overflow > 0:
+            self._skip(overflow)
+
+        tail = (self._head + self._count) % size
+        first = min(len(data), size - tail)
+        self._view[tail:tail+first] = data[:first]
+        self._view[:len(data)-first] = data[first:]
+        self._count += len(data)
+
+        while (payload := self.try_parse_frame()) is not None:
+            self.frameReady.emit(payload)
+
+    def try_parse_frame(self) -> bytes | None:
+        """
+        Removes the next complete read frame from the buffer.
+        Error frames and bytes that do not start a valid frame are discarded on the way.
+        
+        :return: Payload of the read frame, or None if no complete read frame is buffered
+        """
+        while self._count >= 2:
+            start = self._peek(0)
+            payload_length = self._peek(1)
+            # Frames start with 'R' (read) or 'E' (sensor error) and carry at most 8 payload bytes
+            if start not in (FRAME_READ, FRAME_ERROR) or payload_length > 8:
+                self._skip(self._next_start()) # Resynchronize on the next possible start byte
+                continue
+
+            frame_length = payload_length + 3 # start byte, length byte, payload, newline
+            if self._count < frame_length:
+                return None # Wait for the rest of the frame
+            if self._peek(frame_length-1) != FRAME_END:
+                self._skip(self._next_start())
+                continue
+
+            payload = self._copy(2, payload_length)
+            self._skip(frame_length)
+            if start == FRAME_READ:
+                return payload
+        return None
+
+    def clear(self):
+        """
+        Discards all buffered bytes, including any incomplete frame.
+        
+        :return: None
+        """
+        self._head = 0
+        self._count = 0
+
+    def _peek(self, offset: int) -> int:
+        """
+        Returns the unread byte at the given offset from the head without consuming it.
+        """
+        return self._ring[(self._head + offset) % len(self._ring)]
+
+    def _next_start(self) -> int:
+        """
+        Returns the offset from the head of the next byte after the head that can start a frame,
+        or the number of unread bytes if there is none. The search runs in C with bytearray.find
+        on both segments of the ring instead of stepping through the bytes in Python.
+        """
+        size = len(self._ring)
+        first = self._head + 1
+        last = self._head + self._count # May run past the end of the ring
+        offset = self._count
+        for start in (FRAME_READ, FRAME_ERROR):
+            idx = self._ring.find(start, first, min(last, size))
+            if idx < 0 and last > size:
+                idx = self._ring.find(start, max(first - size, 0), last - size)
+                if idx >= 0:
+                    idx += size
+            if idx >= 0:
+                offset = min(offset, idx - self._head)
+        return offset
+
+    def _copy(self, offset: int, length: int) -> bytes:
+        """
+        Returns a copy of length unread bytes starting at the given offset from the head.
+        """
+        start = (self._head + offset) % len(self._ring)
+        end = start + length
+        if end <= len(self._ring):
+            return bytes(self._view[start:end])
+        return b"".join((self._view[start:], self._view[:end-len(self._ring)]))
+
+    def _skip(self, length: int):
+        """
+        Consumes length unread bytes by advancing the head.
+        """
+        self._head = (self._head + length) % len(self._ring)
+        self._count -= length
+
+class ArduinoSerial(QObject):
     """
     Handles the connection to the Arduino board via serial communication.
     Allows sending and receiving data, as well as scanning for available ports.
     If no port is specified, it will scan for available ports and connect to the first Arduino
+    Incoming bytes are read asynchronously through QSerialPort's readyRead signal and split into
+    frames by a FrameDecoder. The payload of every complete read frame is emitted through the frameReady signal.
     """
-    def __init__(self, port: str, baudrate: int = 500000, timeout: float = 1):
+    frameReady = pyqtSignal(bytes)
+
+    def __init__(self, port: str, baudrate: int = 500000, timeout: float = 3):
         """
         Initializes the ArduinoSerial object with the specified port, baudrate, and timeout.
         If the port is not specified, it will scan for available ports.
         
         :param port: Serial port to connect to (e.g., 'COM3' on Windows or '/dev/ttyUSB0' on Linux)
         :param baudrate: Baud rate for the serial communication (default is 500000)
-        :param timeout: Timeout for the serial communication (default is 1 second)        
+        :param timeout: Timeout for the Arduino to report ready after connecting (default is 3 seconds)
         """
+        super().__init__()
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.connection = None
+        self.decoder = FrameDecoder()
+        self.decoder.setParent(self)
+        self.decoder.frameReady.connect(self.frameReady)
 
     def connect(self):
         """
         Connects to the Arduino board via the specified serial port.
         If the port is not set, it scans for available ports and connects to the first one
         that matches 'Arduino' in its description.
-        Raises a SerialException if the connection fails.
+        Logs the error reported by QSerialPort if the connection fails.
 
-        :raises serial.SerialException: If the connection to the Arduino fails
+        :return: None
+        """
+        # If port is not set scan ports
+        if self.port == "":
+            for info in QSerialPortInfo.availablePorts():
+                logger.debug("Device: %s, Description: %s", info.systemLocation(), info.description())
+                if 'Arduino' in info.description():
+                    logger.info("Arduino found on %s", info.systemLocation())
+                    self.port = info.systemLocation()
+
+        self.connection = QSerialPort(self.port)
+        self.connection.setBaudRate(self.baudrate)
+        if not self.connection.open(QIODevice.OpenModeFlag.ReadWrite):
+            logger.error("Failed to connect: %s", self.connection.errorString())
+            return
+
+        if sys.platform.startswith('linux'):
+            self._set_low_latency()
+
+        self._wait_ready()
+        self.connection.readyRead.connect(self._on_ready_read)
+        logger.info("Connected to %s at %s baud.", self.port, self.baudrate)
+
+    def _wait_ready(self):
+        """
+        Resets the Arduino by toggling DTR and waits until the sketch reports READY.
+        The sketch prints READY at the end of setup, which is waited for without sending anything,
+        because bootloaders such as the Mega's stk500v2 stay active as long as bytes arrive.
+        If the port stays silent past BOOTLOADER_WINDOW, the board did not reset (e.g. Teensy)
+        and READY? is sent once, which the sketch answers with READY. Gives up after timeout seconds.
         
         :return: None
         """
+        self.connection.setDataTerminalReady(False)
+        time.sleep(0.05)
+        self.connection.setDataTerminalReady(True)
+
+        received = bytearray()
+        queried = False
+        start = time.monotonic()
+        while (elapsed := time.monotonic() - start) < self.timeout:
+            if not received and not queried and elapsed >= BOOTLOADER_WINDOW:
+                self.connection.write(READY_QUERY)
+                queried = True
+            if self.connection.waitForReadyRead(100):
+                received += self.connection.read(self.connection.bytesAvailable())
+                if READY_REPLY in received:
+                    return
+
+        logger.warning("Arduino on %s did not report ready within %s s.", self.port, self.timeout)
+
+    def _set_low_latency(self):
+        """
+        Sets the ASYNC_LOW_LATENCY flag of the serial port (Linux only).
+        USB serial drivers such as ftdi_sio otherwise hold received bytes for up to 16 ms
+        before passing them on. Drivers that do not support the flag are left unchanged.
+        
+        :return: None
+        """
+        # Only available on Unix, so imported here
+        import array
+        import fcntl
+        import termios
+
+        ASYNC_LOW_LATENCY = 0x2000
         try:
-            # If port is not set scan ports
-            if self.port == "":
-                ports = serial.tools.list_ports.comports()
-                select_idx = -1
-                for idx, port in enumerate(ports):
-                    print(f"Device: {port.device}, Description: {port.description}")
-                    if 'Arduino' in port.description:
-                        print(f"Arduino found on {port.device}")
-                        self.port = port.device
-                        select_idx = idx
-
-            self.connection = serial.Serial(self.port, self.baudrate, timeout=self.timeout)
-            time.sleep(2) # Wait for Arduino reset
-            print(f"Connected to {self.port} at {self.baudrate} baud.")
-        except serial.SerialException as e:
-            print(f"Failed to connect: {e}")
+            serial_info = array.array('i', [0] * 32) # struct serial_struct, flags is the 5th int
+            fcntl.ioctl(self.connection.handle(), termios.TIOCGSERIAL, serial_info)
+            serial_info[4] |= ASYNC_LOW_LATENCY
+            fcntl.ioctl(self.connection.handle(), termios.TIOCSSERIAL, serial_info)
+        except OSError as e:
+            logger.debug("Low latency mode not set on %s: %s", self.port, e)
 
     def disconnect(self):
         """
         Disconnects from the Arduino board.
-        If the connection is open, it closes the connection and prints a message.
+        If the connection is open, it closes the connection and logs a message.
         
         :return: None
         """
-        if self.connection and self.connection.is_open:
+        if self.connection and self.connection.isOpen():
             self.connection.close()
-            print('Disconnected.')
+            logger.info('Disconnected.')
 
-    def send(self, data: str):
+    def send(self, data: str | bytes):
         """
         Sends data to the Arduino board via the serial connection.
-        If the connection is open, it encodes the data and writes it to the serial port
+        If the connection is open, it encodes the data and writes it to the serial port.
+        Bytes are written as is, so constant commands can be encoded once up front.
         
         :param data: Data to send to the Arduino
         
         :return: None
         """
-        if self.connection and self.connection.is_open:
-            self.connection.write(data.encode())
-            # print(f"Sent: {data}")
+        if self.connection and self.connection.isOpen():
+            if isinstance(data, str):
+                data = data.encode()
+            self.connection.write(data)
 
-    def receive(self) -> str:
+    def _on_ready_read(self):
         """
-        Receives data from the Arduino board via the serial connection.
-        If the connection is open and there is data available, it reads a line from the serial port.
-        If no data is available, it returns an empty string.
+        Drains all available bytes from the serial port into the frame decoder.
+        Called by the event loop whenever new data arrives, so it never blocks waiting for the Arduino.
         
-        :return: Received data as a string, or an empty string if no data is available
-        """
-        if self.connection and self.connection.is_open:
-            if self.connection.in_waiting > 0:
-                return self.connection.readline()
-                # return self.connection.readline().decode().strip()
-        return ""
-    
+        :return: None
+        """
+        self.decoder.feed(self.connection.read(self.connection.bytesAvailable()))
+
     def reset_input_buffer(self):
         """
         Resets the input buffer of the serial connection.
@@ -110,8 +309,9 @@ class ArduinoSerial():
         
         :return: None
         """
-        if self.connection and self.connection.is_open:
-            self.connection.reset_input_buffer()
+        self.decoder.clear()
+        if self.connection and self.connection.isOpen():
+            self.connection.clear(QSerialPort.Direction.Input)
 
     def is_connected(self) -> bool:
         """
@@ -119,14 +319,75 @@ class ArduinoSerial():
         
         :return: True if connected, False otherwise
         """
-        return self.connection is not None and self.connection.is_open
+        return self.connection is not None and self.connection.isOpen()
+
+
+class SerialWorker(QObject):
+    """
+    Runs the Arduino serial I/O on a worker thread, so sampling is not delayed by plot repaints.
+    Owns the ArduinoSerial connection and a timer that sends the read-all command every sample period.
+    Frames received from the Arduino are forwarded through frameReady; connect it with a queued
+    connection to handle them on the GUI thread.
+    """
+    frameReady = pyqtSignal(bytes)
+
+    def __init__(self, sample_period_ms: int):
+        """
+        Initializes the SerialWorker. The Arduino is connected by open once the worker runs on its thread.
+        
+        :param sample_period_ms: Period of the read-all commands in milliseconds
+        """
+        super().__init__()
+        self.sample_period_ms = sample_period_ms
+        self.timer = None
+
+        self.ard = ArduinoSerial(port="")
+        self.ard.setParent(self)
+        self.ard.frameReady.connect(self.frameReady)
+
+    @pyqtSlot()
+    def open(self):
+        """
+        Connects to the Arduino and creates the sample timer on the worker thread.
+        Connect this slot to QThread.started.
+        """
+        self.ard.connect()
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.sample_period_ms)
+        self.timer.timeout.connect(self.grab_data)
 
-    def __del__(self):
+    @pyqtSlot()
+    def close(self):
+        """
+        Stops the sample timer and disconnects from the Arduino.
+        Connect this slot to QThread.finished so it runs on the worker thread when the thread stops.
+        """
+        if self.timer is not None:
+            self.timer.stop()
+        self.ard.disconnect()
+
+    @pyqtSlot()
+    def start(self):
+        """
+        Starts sending read-all commands every sample period.
+        """
+        self.timer.start()
+
+    @pyqtSlot()
+    def stop(self):
+        """
+        Stops sending read-all commands.
+        """
+        self.timer.stop()
+
+    def grab_data(self):
         """
-        Destructor to ensure the connection is closed when the object is deleted.
-        This is called when the object goes out of scope or is explicitly deleted.
+        Requests new data from the Arduino sensors.
+        This method is called periodically by the timer to fetch new sensor readings.
+        It only sends the read-all command; the reply is emitted through frameReady when it arrives,
+        so the worker thread never waits for the Arduino.
         """
-        self.disconnect()
+        self.ard.send(READ_ALL_COMMAND)
 
 
 class PlotApp(QMainWindow):
@@ -136,6 +397,9 @@ class PlotApp(QMainWindow):
     Initializes the Arduino connection, sets up the GUI components, and handles real-time data updates.
     The GUI includes controls for pumps, valves, and sensor plots.
     """
+    startAcquisition = pyqtSignal()
+    stopAcquisition = pyqtSignal()
+
     def __init__(self):
         """
         Initializes the GUI components and layout.
@@ -144,21 +408,38 @@ class PlotApp(QMainWindow):
         super().__init__()
 
         self.sample_period_ms = 50
-        self.display_period_ms = 100
+        self.display_period_ms = 33 # Minimum time between plot redraws (~30 Hz)
 
         ############# Connect Devices ##############
-        self.ard = ArduinoSerial(port="")
-        self.ard.connect()
+        # Serial I/O runs on its own thread; frames are handed to the GUI thread through a queued connection
+        self.serial_thread = QThread()
+        self.serial_worker = SerialWorker(self.sample_period_ms)
+        self.serial_worker.moveToThread(self.serial_thread)
+        self.serial_thread.started.connect(self.serial_worker.open)
+        self.serial_thread.finished.connect(self.serial_worker.close)
+        self.serial_worker.frameReady.connect(self.store_frame, Qt.ConnectionType.QueuedConnection)
+        self.startAcquisition.connect(self.serial_worker.start)
+        self.stopAcquisition.connect(self.serial_worker.stop)
+        self.serial_thread.start()
 
         ############# Initialize variables ##############
         self.data_window_len = 50
         self.num_sensor_channels = 2
 
         self.sensors = ['A0', 'A1', 'FS']
-        # self.adc_data = [deque(maxlen=self.data_window_len) for _ in range(self.num_sensor_channels)]
-        self.adc_data = {}
-        for ch in self.sensors:
-            self.adc_data[ch] = deque(maxlen=self.data_window_len)
+        # Ring buffer holding the latest data_window_len samples of every sensor (one row per sensor).
+        # Every sample is written twice, at adc_head and adc_head + data_window_len, so the window
+        # adc_buf[:, adc_head:adc_head + data_window_len] is always the samples from oldest to newest
+        # and can be plotted without reordering. adc_head is the column the next sample is written to.
+        self.adc_buf = np.zeros((len(self.sensors), 2 * self.data_window_len), dtype=np.float32)
+        self.adc_head = 0
+        # Copy of the displayed window of every sensor handed to the plots. pyqtgraph keeps the array
+        # passed to setData and reads it again at paint time, so it must not be a view of adc_buf.
+        self.plot_buf = np.zeros((len(self.sensors), self.data_window_len), dtype=np.float32)
+        # Sample index axis shared by all sensor plots
+        self.x_axis = np.arange(self.data_window_len)
+        # Indices of the sensors that received new samples since their plot was last redrawn
+        self.dirty = set()
 
         self.num_pumps = 4
 
@@ -181,6 +462,9 @@ class PlotApp(QMainWindow):
         # Setup main layout
         main_layout.addLayout(controls_layout, 0, 0, 1, 1)
         main_layout.addLayout(plots_layout, 0, 1, 12, 4)
+        # Fixed stretch factors, so extra width goes to the plots
+        main_layout.setColumnStretch(0, 1)
+        main_layout.setColumnStretch(1, 4)
 
         # Control section
         control_row = 0
@@ -188,6 +472,7 @@ class PlotApp(QMainWindow):
         # Pump control
         self.pump_flowrate_spinbox = []
         self.pump_button = []
+        self.pump_on = [False] * self.num_pumps # Pump state, the button text only mirrors it
         
         for idx in range(self.num_pumps):
             controls_layout.addWidget(QLabel(f"Pump {idx} flow rate ():"), control_row, 0, 1, 1) #, alignment=Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
@@ -202,7 +487,7 @@ class PlotApp(QMainWindow):
             controls_layout.addWidget(self.pump_button[idx], control_row, 2, 1, 1) #, alignment=Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
             control_row += 1
 
-            self.pump_button[idx].clicked.connect(lambda checked, index=idx: self.toggle_pump(index))
+            self.pump_button[idx].clicked.connect(partial(self.toggle_pump, idx))
             
 
         self.all_pumps_on_button = QPushButton("All Pumps ON")
@@ -230,20 +515,29 @@ class PlotApp(QMainWindow):
         # self.plot_widgets = []
         plots_row = 0
 
-        self.plot_widget = pg.GraphicsLayoutWidget(show=True, title="Sensors")
+        self.plot_widget = pg.GraphicsLayoutWidget(show=False)
         self.sensor_plot_items = []
         self.sensor_plot_data_items = []
+        # One cosmetic pen per sensor, built once and shared with its curve
+        self.sensor_pens = [pg.mkPen(pg.intColor(idx, hues=len(self.sensors)), width=1, cosmetic=True) for idx in range(len(self.sensors))]
         for i in range(self.num_sensor_channels):
             self.sensor_plot_items.append(self.plot_widget.addPlot(row=i, col=0, title=f"ADC Channel {i}"))
             if i > 0:
                 self.sensor_plot_items[i].setXLink(self.sensor_plot_items[0])
-            self.sensor_plot_data_items.append(self.sensor_plot_items[-1].plot())
+            self.sensor_plot_data_items.append(self.sensor_plot_items[-1].plot(pen=self.sensor_pens[i], symbol=None))
 
         # Add Flow sensor plot
         self.sensor_plot_items.append(self.plot_widget.addPlot(row=self.num_sensor_channels, col=0, title=f"Flow rate"))
         self.sensor_plot_items[-1].setXLink(self.sensor_plot_items[0])
-        self.sensor_plot_data_items.append(self.sensor_plot_items[-1].plot())
+        self.sensor_plot_data_items.append(self.sensor_plot_items[-1].plot(pen=self.sensor_pens[self.num_sensor_channels], symbol=None))
 
+        # Only draw the visible samples, reduced to min/max pairs per pixel column
+        for data_item in self.sensor_plot_data_items:
+            data_item.setDownsampling(auto=True, method='peak')
+            data_item.setClipToView(True)
+
+        # Plot data item, ring buffer row and plot buffer row of every sensor, looked up by sensor index in update_plot
+        self._update_pairs = [(self.sensor_plot_data_items[idx], self.adc_buf[idx], self.plot_buf[idx]) for idx in range(len(self.sensors))]
 
         # for i in range(num_sensor_channels):
         #     # Sensor label
@@ -257,9 +551,11 @@ class PlotApp(QMainWindow):
         plots_layout.addWidget(self.plot_widget, plots_row, 0, 11, 4)
         plots_row += 11
 
+        self._grid_shown = None # Grid state last applied to the plots
         self.grid_checkbox = QCheckBox("Show Grid")
         self.grid_checkbox.setChecked(True)
         self.grid_checkbox.stateChanged.connect(self.toggle_grid)
+        self.toggle_grid()
         plots_layout.addWidget(self.grid_checkbox, plots_row, 0, 1, 1)
 
         self.toggle_timer_button = QPushButton("Start Real-Time")
@@ -272,19 +568,15 @@ class PlotApp(QMainWindow):
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
-        # Timer for real-time updates
-        self.timer_ui = QTimer()
-        self.timer_ui.setInterval(self.display_period_ms)
-        self.timer_ui.timeout.connect(self.update_plot)
-
-        # Timer for Arduino data poll
-        self.timer_data = QTimer()
-        self.timer_data.setInterval(self.sample_period_ms)
-        self.timer_data.timeout.connect(self.grab_data)
+        # Time of the last plot redraw, redraws are driven by incoming frames
+        self._last_draw = 0.0
+        # Draws the samples that arrived too soon after the last redraw once display_period_ms has passed
+        self.redraw_timer = QTimer()
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.timeout.connect(self.redraw_plot)
 
-        # Data storage
-        self.x = np.linspace(0, 10, 500)
-        self.y = []
+        # Directory last used by the export dialogs
+        self._last_dir = ""
 
         # Menu bar
         self.create_menu_bar()
@@ -333,91 +625,111 @@ class PlotApp(QMainWindow):
     def update_plot(self):
         """
         Updates the plots with the latest sensor data.
-        This method is called periodically by the timer to refresh the plots with new data.
+        This method is called by redraw_plot, at most once every display_period_ms.
         It reads the latest values from the sensors and updates the corresponding plot items.
+        Plots of sensors without new samples since the last update are not redrawn.
         """
-        plot_idx = 0
-        for ch in self.sensors:
-            self.sensor_plot_data_items[plot_idx].setData(list(self.adc_data[ch]))
-            plot_idx += 1
+        if not self.dirty:
+            return
 
-    def grab_data(self):
+        # Sensor values are always finite, so pyqtgraph's NaN/Inf scan is skipped
+        start = self.adc_head
+        end = start + self.data_window_len
+        for idx in self.dirty:
+            data_item, row, plot_row = self._update_pairs[idx]
+            np.copyto(plot_row, row[start:end])
+            data_item.setData(self.x_axis, plot_row, skipFiniteCheck=True)
+        self.dirty.clear()
+
+    def store_frame(self, data: bytes):
+        """
+        Writes the payload of a read-all frame into the current column of the adc_buf ring buffer.
+        The payload holds ADC0 value (2 byte), ADC1 value (2 byte) and Flow sensor value (4 byte).
+        Redraws the plots if at least display_period_ms passed since the last redraw.
+        Otherwise the redraw timer is started, so the new samples are drawn once the period is over.
+        
+        :param data: Payload of the read frame received from the Arduino
         """
-        Reads data from the Arduino sensors and updates the adc_data deque.
-        This method is called periodically by the timer to fetch new sensor readings.
-        It sends a read command to each sensor channel, waits for the response, and appends the data
-        to the corresponding deque in adc_data.
-        """
-
-        self.ard.reset_input_buffer()
-        self.ard.send(f"R AL\n") # Read all sensor command
-        time.sleep(0.020)
-        data = self.ard.receive()
-        print(f"R AL command received: {data}")
-        if len(data) > 0:
-            if data[0] == int.from_bytes(b'R'):
-                payloadLength = data[1]
-                # print(f' Read packet received with length {payloadLength} bytes')
-                
-                # ADC0 data
-                data_idx = 2
-                self.adc_data['A0'].append(int.from_bytes(data[data_idx:data_idx+2], byteorder='little'))
-                data_idx += 2
-
-                # ADC1 data
-                self.adc_data['A1'].append(int.from_bytes(data[data_idx:data_idx+2], byteorder='little'))
-                data_idx += 2
-
-                # Flow sensor data
-                self.adc_data['FS'].append(struct.unpack('<f', data[data_idx:data_idx+4])[0])
-                    
-    def toggle_pump(self, idx: int):
+        if len(data) != READ_ALL_PAYLOAD.size:
+            return # Not a read all reply
+
+        values = READ_ALL_PAYLOAD.unpack(data)
+        self.adc_buf[:, self.adc_head] = values
+        self.adc_buf[:, self.adc_head + self.data_window_len] = values
+        self.adc_head = (self.adc_head + 1) % self.data_window_len
+        self.dirty.update(range(len(self.sensors)))
+
+        elapsed = time.monotonic() - self._last_draw
+        period = self.display_period_ms / 1000.0
+        if elapsed >= period:
+            self.redraw_plot()
+        elif not self.redraw_timer.isActive():
+            self.redraw_timer.start(int((period - elapsed) * 1000) + 1)
+
+    def redraw_plot(self):
+        """
+        Redraws the plots of the sensors with new samples and records the time of the redraw.
+        This method is called by store_frame, or by the redraw timer for samples that arrived
+        within display_period_ms of the previous redraw.
+        """
+        self.redraw_timer.stop()
+        self.update_plot()
+        self._last_draw = time.monotonic()
+
+    def toggle_pump(self, idx: int, checked: bool = False):
         """
         Toggles the state of the specified pump.
-        If the pump is currently set to ON, it changes the button text to OFF and vice
-        versa. It also prints the current state of the pump to the console.
+        Flips the stored pump state and updates the button text to offer the opposite
+        action. It also logs the new state of the pump.
         
         :param idx: Index of the pump to toggle (0 to num_pumps-1)
+        :param checked: Checked state passed by the button's clicked signal (unused)
         """
         if idx < 0 or idx >= self.num_pumps:
-            print(f"Invalid pump index: {idx}. Must be between 0 and {self.num_pumps - 1}.")
+            logger.warning("Invalid pump index: %d. Must be between 0 and %d.", idx, self.num_pumps - 1)
             return
 
-        print(f"Toggle Pump {idx} state")
+        logger.debug("Toggle Pump %d state", idx)
 
-        if self.pump_button[idx].text() == f"Set Pump {idx} ON":
-            print(" Turn pump on")
+        self.pump_on[idx] = not self.pump_on[idx]
+        if self.pump_on[idx]:
+            logger.info("Turn pump %d on", idx)
             self.pump_button[idx].setText(f"Set Pump {idx} OFF")
-        elif self.pump_button[idx].text() == f"Set Pump {idx} OFF":
-            print(" Turn pump off")
+        else:
+            logger.info("Turn pump %d off", idx)
             self.pump_button[idx].setText(f"Set Pump {idx} ON")
 
     def all_pumps_on(self):
         """
-        Turns all pumps on by iterating through the pump buttons and toggling each one that is currently set to OFF.
+        Turns all pumps on by toggling each pump that is currently off.
         This method is called when the "All Pumps ON" button is clicked.
         """
-        print("Turn all pumps on")
-        for idx in range(self.num_pumps):
-            if self.pump_button[idx].text() == f"Set Pump {idx} ON":
+        logger.info("Turn all pumps on")
+        for idx, on in enumerate(self.pump_on):
+            if not on:
                 self.toggle_pump(idx)
 
     def all_pumps_off(self):
         """
-        Turns all pumps off by iterating through the pump buttons and toggling each one that is currently set to ON.
+        Turns all pumps off by toggling each pump that is currently on.
         This method is called when the "All Pumps OFF" button is clicked.
         """
-        print("Turn all pumps off")
-        for idx in range(self.num_pumps):
-            if self.pump_button[idx].text() == f"Set Pump {idx} OFF":
+        logger.info("Turn all pumps off")
+        for idx, on in enumerate(self.pump_on):
+            if on:
                 self.toggle_pump(idx)
 
     def toggle_grid(self):
         """
         Toggles the visibility of the grid on the plot.
+        Does nothing if the grid is already in the state of the checkbox.
         """
         show = self.grid_checkbox.isChecked()
-        self.plot_widget.showGrid(x=show, y=show)
+        if self._grid_shown == show:
+            return
+        self._grid_shown = show
+        for plot_item in self.sensor_plot_items:
+            plot_item.showGrid(x=show, y=show)
 
     def toggle_timer(self):
         """
@@ -427,46 +739,68 @@ class PlotApp(QMainWindow):
         This method is called when the "Start Real-Time" button is clicked.
         """
         if self.toggle_timer_button.isChecked():
-            self.timer_ui.start()
-            self.timer_data.start()
+            self.startAcquisition.emit()
             self.toggle_timer_button.setText("Stop Real-Time")
         else:
-            self.timer_data.stop()
-            self.timer_ui.stop()
+            self.stopAcquisition.emit()
             self.toggle_timer_button.setText("Start Real-Time")
 
+    def closeEvent(self, event):
+        """
+        Stops the redraw timer and the serial worker thread before the window closes.
+        The worker disconnects from the Arduino on its own thread when the thread finishes,
+        so the serial port is closed deterministically here instead of at garbage collection.
+        
+        :param event: Close event
+        """
+        self.redraw_timer.stop()
+        self.serial_thread.quit()
+        self.serial_thread.wait()
+        super().closeEvent(event)
+
     def export_image(self):
         """
         Exports the current plot as an image file.
         Opens a file dialog to select the save location and file name.
-        Uses the ImageExporter from pyqtgraph to save the plot as a PNG file.
+        When pyqtgraph renders with OpenGL, the plot widget is grabbed directly from the framebuffer.
+        Otherwise the ImageExporter from pyqtgraph repaints the scene and saves it as a PNG file.
+        The exporter is created for every export, so the image size follows the current window size.
         
         :return: None
         """
-        filename, _ = QFileDialog.getSaveFileName(self, "Save Plot Image", "", "PNG Files (*.png);;All Files (*)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Plot Image", self._last_dir, "PNG Files (*.png);;All Files (*)")
         if filename:
-            exporter = pg.exporters.ImageExporter(self.plot_widget.plotItem)
+            self._last_dir = os.path.dirname(filename)
+            if pg.getConfigOption('useOpenGL'):
+                self.plot_widget.grab().save(filename)
+                return
+
+            exporter = pg.exporters.ImageExporter(self.plot_widget.scene())
             exporter.export(filename)
 
     def export_csv(self):
         """
-        Exports the current plot data to a CSV file.
+        Exports the current sensor data window to a CSV file.
         Opens a file dialog to select the save location and file name.
-        Uses the csv module to write the data to the CSV file.
+        Writes one row per sample with its time and the value of every sensor, oldest first,
+        using numpy.savetxt on a snapshot of the adc_buf ring buffer.
 
         :return: None
         """
-        filename, _ = QFileDialog.getSaveFileName(self, "Export Data to CSV", "", "CSV Files (*.csv);;All Files (*)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Data to CSV", self._last_dir, "CSV Files (*.csv);;All Files (*)")
         if filename:
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                header = ["x"] + [label for label, _ in self.y]
-                writer.writerow(header)
-                for i in range(len(self.x)):
-                    row = [self.x[i]] + [y[i] for _, y in self.y]
-                    writer.writerow(row)
+            self._last_dir = os.path.dirname(filename)
+            # Sample times in seconds over the data window
+            x = np.arange(self.data_window_len) * (self.sample_period_ms / 1000.0)
+            window = self.adc_buf[:, self.adc_head:self.adc_head + self.data_window_len]
+            header = ["Time (s)"] + self.sensors
+            data = np.column_stack([x, window.T])
+            np.savetxt(filename, data, delimiter=",", header=",".join(header), comments="", fmt="%.6g")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Render the plots through an OpenGL viewport
+    pg.setConfigOptions(useOpenGL=True, antialias=False)
     app = QApplication(sys.argv)
     window = PlotApp()
     window.show()